@@ -1,11 +1,25 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+import weakref
+from dataclasses import dataclass, field
 from typing import List, Optional
 
+try:
+    import hyperscan  # type: ignore
+except Exception:  # pragma: no cover - optional accelerator
+    hyperscan = None  # type: ignore
 
-@dataclass
+try:
+    import re2  # type: ignore  # google-re2: linear-time matching, no ReDoS
+except Exception:  # pragma: no cover - optional accelerator
+    re2 = None  # type: ignore
+
+# Rule fields whose edits the owning engines must pick up.
+_TRACKED_FIELDS = frozenset(("pattern", "case_sensitive", "is_active", "once", "_fired"))
+
+
+@dataclass(slots=True)
 class AutomationRule:
     pattern: str
     response: str
@@ -16,31 +30,315 @@ class AutomationRule:
     is_active: bool = True
 
     # runtime state
-    _fired: bool = False
+    _fired: bool = field(default=False, init=False)
+    _compiled: Optional[re.Pattern] = field(default=None, init=False, repr=False, compare=False)
+    # Needle for patterns with no regex syntax; lowercased when case-insensitive.
+    _literal: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    # Engines scanning this rule; told about edits so they can recompile lazily.
+    _owners: weakref.WeakSet = field(default_factory=weakref.WeakSet, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._compile()
+
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        # Keep the cached regex in sync if the rule is edited after construction.
+        if name in ("pattern", "case_sensitive") and getattr(self, "_compiled", None) is not None:
+            self._compile()
+        if name in _TRACKED_FIELDS:
+            for engine in getattr(self, "_owners", ()):
+                engine._rule_edited(name)
+
+    def _compile(self) -> None:
+        # Patterns stay text in config; scanning happens on raw PTY bytes.
+        compiled = _compile(self.pattern.encode("utf-8"), self.case_sensitive)
+        if isinstance(compiled, re.Pattern) and _needs_text(self.pattern):
+            # `re` on bytes sees one byte per character and folds ASCII only;
+            # match these rules on decoded text instead (RE2 handles UTF-8 itself).
+            compiled = re.compile(self.pattern, 0 if self.case_sensitive else re.IGNORECASE)
+        object.__setattr__(self, "_compiled", compiled)
+        object.__setattr__(self, "_literal", _literal(self.pattern, self.case_sensitive))
 
-    def matches(self, text: str) -> bool:
+    def matches(self, data: bytes) -> bool:
         if not self.is_active:
             return False
         if self.once and self._fired:
             return False
-        flags = 0 if self.case_sensitive else re.IGNORECASE
-        return re.search(self.pattern, text, flags) is not None
+        if self._literal is not None:
+            return (data if self.case_sensitive else data.lower()).find(self._literal) != -1
+        if _is_text(self._compiled):
+            return self._compiled.search(data.decode("utf-8", errors="replace")) is not None
+        return self._compiled.search(data) is not None
 
     def mark_fired(self) -> None:
-        self._fired = True
+        # Bypasses __setattr__: the engine that fires a rule invalidates itself.
+        object.__setattr__(self, "_fired", True)
 
 
 class AutomationEngine:
     def __init__(self, rules: List[AutomationRule] | None = None) -> None:
         self.rules: List[AutomationRule] = rules or []
+        self._hs_db = None
+        self._hs_stream = None
+        self._hs_hit: Optional[int] = None
+        # hyperscan does not keep its own reference to the handler; hold one here.
+        self._hs_handler = self._on_hs_match
+        # Bumped by rule edits and once-rule hits; the fused patterns lag behind it.
+        self._edits = 0
+        # Set when a pattern or case mode changed under the Hyperscan database.
+        self._hs_stale = False
+        self.rebuild()
 
-    def evaluate(self, chunk: str) -> Optional[str]:
+    def rebuild(self) -> None:
         """
-        Evaluate incoming output text against rules in order.
-        Returns the first response to send, or None.
+        Recompile all matchers. Call after adding or removing rules; edits to
+        existing rules are picked up on the next evaluate.
         """
         for rule in self.rules:
-            if rule.matches(chunk):
-                rule.mark_fired()
-                return rule.response
+            rule._owners.add(self)
+        self._fuse()
+        self._build_hyperscan()
+
+    def _fuse(self) -> None:
+        """
+        Fuse the eligible rules into one alternation per case mode so a chunk
+        is scanned once instead of once per rule.
+        """
+        self._fused_edits = self._edits
+        self._combined: List[re.Pattern] = []
+        self._unfused: List[tuple[int, AutomationRule]] = []
+        self._literals: List[tuple[int, AutomationRule]] = []
+        # Grouped by case mode and by engine, so rules RE2 accepts stay on RE2.
+        parts: dict[tuple[bool, bool], List[tuple[int, AutomationRule, bytes]]] = {}
+        for i, rule in enumerate(self.rules):
+            if not self._eligible(rule):
+                continue
+            if rule._literal is not None:
+                self._literals.append((i, rule))
+                continue
+            use_re2 = not isinstance(rule._compiled, re.Pattern)
+            if use_re2 or (not _is_text(rule._compiled) and _fusable(rule.pattern)):
+                part = b"(?P<%s%d>%s)" % (_GROUP_PREFIX, i, rule.pattern.encode("utf-8"))
+                parts.setdefault((rule.case_sensitive, use_re2), []).append((i, rule, part))
+            else:
+                self._unfused.append((i, rule))
+        for (case_sensitive, use_re2), members in parts.items():
+            try:
+                combined = _compile(b"|".join(part for _, _, part in members), case_sensitive, use_re2)
+            except re.error:
+                # e.g. two rules defining the same named group; scan them one by one.
+                self._unfused.extend((i, rule) for i, rule, _ in members)
+                continue
+            self._combined.append(combined)
+
+    def _build_hyperscan(self) -> None:
+        """
+        Compile all rules into a streaming Hyperscan database when available.
+        Falls back to the fused `re` patterns if any rule is unsupported
+        (backreferences, lookarounds, ...) or anchored: in stream mode ^ and $
+        refer to the stream, which restarts after every hit, not to each chunk.
+        """
+        self.close()
+        self._hs_db = None
+        self._hs_stale = False
+        if hyperscan is None or not self.rules:
+            return
+        if any(_anchored(r.pattern) for r in self.rules):
+            return
+        # Match on code points (like `re` on str) rather than raw bytes.
+        utf8 = hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_STREAM)
+            db.compile(
+                expressions=[r.pattern.encode("utf-8") for r in self.rules],
+                ids=list(range(len(self.rules))),
+                flags=[utf8 | (0 if r.case_sensitive else hyperscan.HS_FLAG_CASELESS) for r in self.rules],
+            )
+        except hyperscan.error:
+            return
+        self._hs_db = db
+        self._open_stream()
+
+    def _open_stream(self) -> None:
+        # Stream state carries partial matches across chunk boundaries.
+        self._hs_stream = self._hs_db.stream(match_event_handler=self._hs_handler)
+        self._hs_stream.__enter__()
+
+    def close(self) -> None:
+        if self._hs_stream is not None:
+            try:
+                self._hs_stream.close()
+            except Exception:
+                pass
+            self._hs_stream = None
+
+    def evaluate(self, chunk: bytes) -> Optional[str]:
+        """
+        Evaluate incoming raw output bytes against rules.
+        Returns the response of the rule matching leftmost in the chunk
+        (ties go to the earlier rule), or None. With Hyperscan the first
+        match to complete in the stream wins instead.
+        """
+        if self._hs_stale:
+            # The database was compiled from the old patterns (or skipped because
+            # of them); recompile before dispatching.
+            self._build_hyperscan()
+        if self._hs_stream is not None:
+            return self._evaluate_hyperscan(chunk)
+        if self._fused_edits != self._edits:
+            # A rule fired, was toggled or edited since the patterns were fused.
+            self._fuse()
+        best: Optional[tuple[int, int]] = None
+        for combined in self._combined:
+            m = combined.search(chunk)
+            if m:
+                # re reports group names as str, RE2 as bytes (for bytes patterns).
+                cand = (m.start(), int(m.lastgroup[len(_GROUP_PREFIX):]))
+                if best is None or cand < best:
+                    best = cand
+        text: Optional[str] = None
+        for i, rule in self._unfused:
+            if _is_text(rule._compiled):
+                if text is None:
+                    text = chunk.decode("utf-8", errors="replace")
+                m = rule._compiled.search(text)
+                # Convert the code point offset back to a byte offset.
+                start = len(text[: m.start()].encode("utf-8")) if m else 0
+            else:
+                m = rule._compiled.search(chunk)
+                start = m.start() if m else 0
+            if m:
+                cand = (start, i)
+                if best is None or cand < best:
+                    best = cand
+        lowered: Optional[bytes] = None
+        for i, rule in self._literals:
+            if rule.case_sensitive:
+                pos = chunk.find(rule._literal)
+            else:
+                if lowered is None:
+                    lowered = chunk.lower()
+                pos = lowered.find(rule._literal)
+            if pos != -1:
+                cand = (pos, i)
+                if best is None or cand < best:
+                    best = cand
+        if best is None:
+            return None
+        return self._fire(self.rules[best[1]])
+
+    def _evaluate_hyperscan(self, data: bytes) -> Optional[str]:
+        self._hs_hit = None
+        try:
+            self._hs_stream.scan(data)
+        except hyperscan.ScanTerminated:
+            # Terminating a scan ends the stream; start a fresh one.
+            self._hs_stream.close()
+            self._open_stream()
+        if self._hs_hit is None:
+            return None
+        return self._fire(self.rules[self._hs_hit])
+
+    def _on_hs_match(self, rule_id: int, start: int, end: int, flags: int, context) -> bool:
+        if not self._eligible(self.rules[rule_id]):
+            return False
+        self._hs_hit = rule_id
+        # Stop scanning at the first live match.
+        return True
+
+    def _fire(self, rule: AutomationRule) -> str:
+        rule.mark_fired()
+        if rule.once:
+            # Fired once-rules can never match again; stop scanning for them.
+            # The fused patterns are rebuilt lazily on the next evaluate.
+            self._edits += 1
+        return rule.response
+
+    def _rule_edited(self, name: str) -> None:
+        """Called by an owned rule when a field that affects matching changes."""
+        self._edits += 1
+        if name in ("pattern", "case_sensitive"):
+            self._hs_stale = True
+
+    @staticmethod
+    def _eligible(rule: AutomationRule) -> bool:
+        return rule.is_active and not (rule.once and rule._fired)
+
+
+def _is_text(compiled) -> bool:
+    """Whether a compiled rule matches decoded text rather than raw bytes."""
+    return isinstance(compiled, re.Pattern) and isinstance(compiled.pattern, str)
+
+
+# Unescaped ".", negated classes and the \w \b \s \d shorthands (and their
+# negations) are ASCII/byte-level on bytes patterns.
+_TEXT_SYNTAX_RE = re.compile(r"\\[^wWbBsSdD]|(\.|\[\^|\\[wWbBsSdD])")
+
+
+def _needs_text(pattern: str) -> bool:
+    """Whether a pattern only means what it says when matched on decoded text."""
+    if not pattern.isascii():
+        return True
+    return any(m.group(1) for m in _TEXT_SYNTAX_RE.finditer(pattern))
+
+
+def _compile(pattern: bytes, case_sensitive: bool, use_re2: bool = True):
+    """
+    Compile with RE2 when installed, falling back to `re` for patterns RE2
+    rejects (backreferences, lookarounds, ...).
+    """
+    if use_re2 and re2 is not None:
+        options = re2.Options()
+        options.case_sensitive = case_sensitive
+        options.log_errors = False
+        try:
+            return re2.compile(pattern, options)
+        except re2.error:
+            pass
+    return re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+
+
+# Plain characters and escaped punctuation only, e.g. "login:" or "\\[Y/N\\]".
+_LITERAL_RE = re.compile(r"(?:[^.^$*+?{}\[\]\\|()]|\\[^A-Za-z0-9])*")
+_UNESCAPE_RE = re.compile(r"\\(.)")
+
+
+def _literal(pattern: str, case_sensitive: bool) -> Optional[bytes]:
+    """Return the bytes a pattern matches verbatim, or None if it needs a regex."""
+    if not pattern or not _LITERAL_RE.fullmatch(pattern):
+        return None
+    text = _UNESCAPE_RE.sub(r"\1", pattern)
+    if case_sensitive:
+        return text.encode("utf-8")
+    if not text.isascii():
+        # bytes.lower() only folds ASCII; the regex path folds Unicode (RE2, or a
+        # str pattern under `re`, see AutomationRule._compile).
         return None
+    return text.lower().encode("ascii")
+
+
+# Unescaped ^ or $, or \A/\Z/\z; "[^" (a negated class) is not an anchor.
+_ANCHOR_RE = re.compile(r"(?<!\\)(?:\\\\)*(?:\^|\$|\\[AZz])")
+
+
+def _anchored(pattern: str) -> bool:
+    return _ANCHOR_RE.search(pattern.replace("[^", "[")) is not None
+
+
+# Fused groups are named <prefix><rule index>; unlikely to clash with user groups.
+_GROUP_PREFIX = b"_tuipal_rule_"
+
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def _fusable(pattern: str) -> bool:
+    """Whether a pattern can be wrapped in a named group without changing meaning."""
+    if _BACKREF_RE.search(pattern):
+        # Numbered backreferences would shift once wrapped in an outer group.
+        return False
+    try:
+        re.compile(b"(?P<%s0>%s)" % (_GROUP_PREFIX, pattern.encode("utf-8")))
+    except re.error:
+        # e.g. global inline flags such as "(?i)" must lead the whole pattern.
+        return False
+    return True
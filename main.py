@@ -1,9 +1,18 @@
 from __future__ import annotations
 
-import json
+import re
 import sys
 from pathlib import Path
 
+try:
+    import orjson  # type: ignore
+
+    _loads = orjson.loads
+except Exception:  # pragma: no cover - optional accelerator
+    import json
+
+    _loads = json.loads
+
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout, QMessageBox
 
@@ -26,8 +35,9 @@ class MainWindow(QMainWindow):
             print(f"Windows PTY backend: {getattr(pm, '_PTY_BACKEND_NAME', None)}", file=sys.stderr)
         except Exception:
             pass
+        cfg = self._load_config()
         self.terminal = TerminalWidget()
-        self.sidebar = SidebarWidget()
+        self.sidebar = SidebarWidget(config=cfg)
 
         # Layout
         central = QWidget(self)
@@ -40,16 +50,18 @@ class MainWindow(QMainWindow):
         self.process.output.connect(self.on_output)
         self.process.exited.connect(self.on_exit)
         self.process.error.connect(self.on_error)
-        self.terminal.key_bytes.connect(self.process.write)
+        # Keystrokes are the hottest write path; skip signal dispatch for them.
+        self.terminal.set_write_callback(self.process.write)
+        self.terminal.text_input.connect(self.process.write_text)
         self.terminal.resized.connect(self.process.resize)
         self.sidebar.command_triggered.connect(self._send_text)
 
         # Automation
-        rules = self._load_rules()
+        rules = self._build_rules(cfg)
         self.automation = AutomationEngine(rules)
 
         # Start default shell
-        shell, args = self._default_shell()
+        shell, args = self._default_shell(cfg)
         ok = self.process.start(shell, args)
         if not ok:
             try:
@@ -67,12 +79,11 @@ class MainWindow(QMainWindow):
                         "Remove-Module PSReadLine -ErrorAction SilentlyContinue\r\n"
                         "function prompt { 'PS ' + (Get-Location) + '> ' }\r\n"
                     )
-                    self.process.write(init.encode("utf-8", errors="ignore"))
+                    self.process.write_text(init)
             except Exception:
                 pass
 
-    def _default_shell(self) -> tuple[str, list[str]]:
-        cfg = self._load_config()
+    def _default_shell(self, cfg: dict) -> tuple[str, list[str]]:
         if sys.platform == "win32":
             shell = cfg.get("shell") or "powershell.exe"
             args: list[str] = cfg.get("shell_args", ["-NoLogo", "-NoProfile"])
@@ -83,37 +94,42 @@ class MainWindow(QMainWindow):
 
     def _load_config(self) -> dict:
         try:
-            with open("config.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open("config.json", "rb") as f:
+                return _loads(f.read())
         except Exception:
             return {}
 
-    def _load_rules(self) -> list[AutomationRule]:
-        cfg = self._load_config()
+    def _build_rules(self, cfg: dict) -> list[AutomationRule]:
         rules_cfg = cfg.get("automation_rules", [])
         rules: list[AutomationRule] = []
         for r in rules_cfg:
-            rules.append(
-                AutomationRule(
-                    name=r.get("name"),
-                    pattern=r.get("pattern", ""),
-                    response=r.get("response", ""),
-                    once=r.get("once", True),
-                    case_sensitive=r.get("case_sensitive", False),
-                    delay_ms=r.get("delay_ms", 0),
-                    is_active=r.get("is_active", True),
+            try:
+                rules.append(
+                    AutomationRule(
+                        name=r.get("name"),
+                        pattern=r.get("pattern", ""),
+                        response=r.get("response", ""),
+                        once=r.get("once", True),
+                        case_sensitive=r.get("case_sensitive", False),
+                        delay_ms=r.get("delay_ms", 0),
+                        is_active=r.get("is_active", True),
+                    )
                 )
-            )
+            except re.error as e:
+                # Patterns are compiled up front; skip rules that don't parse.
+                try:
+                    print(f"Skipping automation rule {r.get('name')!r}: {e}", file=sys.stderr)
+                except Exception:
+                    pass
         return rules
 
     # --- slots ---
     def on_output(self, data: bytes) -> None:
         # Automation check
         try:
-            text = data.decode("utf-8", errors="replace")
-            resp = self.automation.evaluate(text)
+            resp = self.automation.evaluate(data)
             if resp:
-                self.process.write(resp.encode())
+                self.process.write_text(resp)
         except Exception:
             pass
         # Render
@@ -134,7 +150,7 @@ class MainWindow(QMainWindow):
         payload = text
         if not payload.endswith("\r") and not payload.endswith("\n"):
             payload += "\r\n"
-        self.process.write(payload.encode())
+        self.process.write_text(payload)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import codecs
 import sys
 import threading
+import time
 from typing import Callable, Optional
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, QSocketNotifier, QTimer, Signal
 
 # Windows-first: use pywinpty to access ConPTY
 IS_WINDOWS = sys.platform == "win32"
@@ -32,6 +34,12 @@ else:
     import termios
     import select
 
+# Output is read in large chunks and coalesced for up to one frame before being
+# emitted, so a flood of output becomes a few big signals instead of thousands.
+_READ_SIZE = 65536
+_COALESCE_BYTES = 65536
+_COALESCE_SECONDS = 0.012
+
 
 class ProcessManager(QObject):
     output = Signal(bytes)
@@ -42,8 +50,14 @@ class ProcessManager(QObject):
         super().__init__()
         self._proc = None
         self._reader_thread: Optional[threading.Thread] = None
+        self._notifier: Optional[QSocketNotifier] = None
+        # POSIX input that the PTY could not take yet; flushed on write readiness.
+        self._write_notifier: Optional[QSocketNotifier] = None
+        self._pending = bytearray()
         self._alive = False
         self._write_fn: Optional[Callable[[bytes], None]] = None
+        # Text-based backends (pywinpty, pexpect) take str directly.
+        self._write_text_fn: Optional[Callable[[str], None]] = None
         self._resize_fn: Optional[Callable[[int, int], None]] = None
 
     def start(self, command: str, args: list[str] | None = None) -> bool:
@@ -80,9 +94,10 @@ class ProcessManager(QObject):
             else:
                 self._spawn_posix(command, args)
             self._alive = True
-            # Start reader thread
-            self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
-            self._reader_thread.start()
+            if IS_WINDOWS:
+                # Start reader thread (POSIX output arrives via QSocketNotifier instead)
+                self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+                self._reader_thread.start()
             return True
         except Exception as e:  # pragma: no cover
             self.error.emit(str(e))
@@ -95,6 +110,16 @@ class ProcessManager(QObject):
             except Exception as e:
                 self.error.emit(str(e))
 
+    def write_text(self, text: str) -> None:
+        """Write text, skipping the encode/decode round-trip on text backends."""
+        if self._write_text_fn:
+            try:
+                self._write_text_fn(text)
+            except Exception as e:
+                self.error.emit(str(e))
+        else:
+            self.write(text.encode("utf-8", errors="replace"))
+
     def resize(self, cols: int, rows: int) -> None:
         """Resize the underlying PTY/console window if supported."""
         try:
@@ -105,6 +130,10 @@ class ProcessManager(QObject):
 
     def stop(self) -> None:
         self._alive = False
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+        if self._write_notifier is not None:
+            self._write_notifier.setEnabled(False)
         # No explicit kill for now; rely on child shell exit via written command.
 
     # --- platform specifics ---
@@ -115,11 +144,17 @@ class ProcessManager(QObject):
         # spawn accepts a str; join with spaces for simplicity (quotes omitted for MVP)
         self._proc = _PTY_BACKEND.PtyProcess.spawn(" ".join(cmdline))  # type: ignore[attr-defined]
 
-        def _writer(data: bytes) -> None:
-            # pywinpty expects text
-            self._proc.write(data.decode(errors="ignore"))
+        if hasattr(self._proc, "write_bytes"):
+            self._write_fn = self._proc.write_bytes  # type: ignore[attr-defined]
+        else:
+            # pywinpty expects text; decode incrementally so split sequences survive.
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
 
-        self._write_fn = _writer
+            def _writer(data: bytes) -> None:
+                self._proc.write(decoder.decode(data))
+
+            self._write_fn = _writer
+        self._write_text_fn = self._proc.write
 
         def _resizer(cols: int, rows: int) -> None:
             # pywinpty PtyProcess exposes set_size(rows, cols) in newer versions; try both orders.
@@ -140,12 +175,19 @@ class ProcessManager(QObject):
         # Fallback: use pexpect's PopenSpawn (no PTY; basic I/O only).
         import pexpect
         cmdline = [command] + args
-        self._proc = pexpect.popen_spawn.PopenSpawn(" ".join(cmdline), encoding="utf-8", timeout=0.1)
+        # pexpect decodes output with an incremental decoder; "replace" keeps a
+        # stray invalid byte from raising and ending the reader loop.
+        self._proc = pexpect.popen_spawn.PopenSpawn(
+            " ".join(cmdline), encoding="utf-8", codec_errors="replace", timeout=0.1
+        )
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
 
         def _writer(data: bytes) -> None:
-            self._proc.send(data.decode(errors="ignore"))
+            self._proc.send(decoder.decode(data))
 
         self._write_fn = _writer
+        self._write_text_fn = self._proc.send
 
         def _resizer(cols: int, rows: int) -> None:
             # No-op: cannot resize without PTY on Windows fallback
@@ -167,9 +209,23 @@ class ProcessManager(QObject):
             stderr=slave_fd,
             close_fds=True,
         )
+        # Drop the parent's copy of the slave so reads fail with EIO once the child exits.
+        os.close(slave_fd)
+
+        # The reader drains the master fd until EAGAIN, so it is non-blocking.
+        os.set_blocking(master_fd, False)
 
         def _writer(data: bytes) -> None:
-            os.write(master_fd, data)
+            if not self._pending:
+                try:
+                    data = data[os.write(master_fd, data):]
+                except BlockingIOError:
+                    pass
+            if data:
+                # PTY input buffer is full (e.g. a large paste). Never wait here: this
+                # runs on the GUI thread, which must keep reading the child's echo.
+                self._pending += data
+                self._write_notifier.setEnabled(True)
 
         self._write_fn = _writer
 
@@ -183,13 +239,17 @@ class ProcessManager(QObject):
 
         self._resize_fn = _resizer
 
+        # Qt watches the fd from the GUI event loop; no reader thread needed.
+        self._notifier = QSocketNotifier(master_fd, QSocketNotifier.Type.Read, self)
+        self._notifier.activated.connect(self._on_posix_ready)
+        self._write_notifier = QSocketNotifier(master_fd, QSocketNotifier.Type.Write, self)
+        self._write_notifier.setEnabled(False)
+        self._write_notifier.activated.connect(self._on_posix_writable)
+
     # --- reader loop ---
     def _reader_loop(self) -> None:
         try:
-            if IS_WINDOWS:
-                self._reader_loop_windows()
-            else:
-                self._reader_loop_posix()
+            self._reader_loop_windows()
         finally:
             self._alive = False
 
@@ -205,19 +265,19 @@ class ProcessManager(QObject):
                 if pexpect is not None and hasattr(self._proc, "read_nonblocking"):
                     # pexpect PopenSpawn path
                     try:
-                        data = self._proc.read_nonblocking(4096, timeout=0.1)  # str
-                        if data:
-                            self.output.emit(data.encode(errors="replace"))
-                        continue
+                        data = self._proc.read_nonblocking(_READ_SIZE, timeout=0.1)  # str
                     except Exception as e:
                         # TIMEOUT means no data yet; keep looping
                         if pexpect and isinstance(e, pexpect.exceptions.TIMEOUT):
                             continue
                         # EOF or other errors -> exit loop
                         break
+                    if data:
+                        self.output.emit(self._drain_pexpect(data).encode(errors="replace"))
+                    continue
                 else:
-                    # pywinpty PtyProcess path
-                    data = self._proc.read(4096)  # str
+                    # pywinpty PtyProcess path (blocking reads; no cheap way to drain)
+                    data = self._proc.read(_READ_SIZE)  # str
                     if not data:
                         break
                     self.output.emit(data.encode(errors="replace"))
@@ -225,19 +285,73 @@ class ProcessManager(QObject):
                 break
         self.exited.emit(0)
 
-    def _reader_loop_posix(self) -> None:
+    def _drain_pexpect(self, first: str) -> str:
+        parts = [first]
+        size = len(first)
+        deadline = time.monotonic() + _COALESCE_SECONDS
+        while size < _COALESCE_BYTES and time.monotonic() < deadline:
+            try:
+                # timeout=0 returns without reading; wait out the rest of the window.
+                more = self._proc.read_nonblocking(_READ_SIZE, timeout=max(1e-3, deadline - time.monotonic()))
+            except Exception:
+                # TIMEOUT (nothing more within the window) or EOF; the main loop handles EOF next.
+                break
+            if not more:
+                break
+            parts.append(more)
+            size += len(more)
+        return "".join(parts)
+
+    def _on_posix_ready(self) -> None:
         import os
-        import select
 
-        while self._alive and self._proc and self._proc.poll() is None:
-            r, _, _ = select.select([self._master_fd], [], [], 0.1)
-            if r:
-                try:
-                    data = os.read(self._master_fd, 4096)
-                    if not data:
-                        break
-                    self.output.emit(data)
-                except Exception:
+        if not self._alive:
+            self._notifier.setEnabled(False)
+            return
+        buf = bytearray()
+        eof = False
+        deadline = time.monotonic() + _COALESCE_SECONDS
+        try:
+            while len(buf) < _COALESCE_BYTES and time.monotonic() < deadline:
+                data = os.read(self._master_fd, _READ_SIZE)
+                if not data:
+                    eof = True
                     break
-        code = self._proc.returncode if self._proc else 0
-        self.exited.emit(code if code is not None else 0)
+                buf += data
+        except BlockingIOError:
+            pass  # drained
+        except OSError:
+            # EIO: the child side of the PTY has closed.
+            eof = True
+        if buf:
+            self.output.emit(bytes(buf))
+        if eof:
+            self._notifier.setEnabled(False)
+            self._write_notifier.setEnabled(False)
+            self._pending.clear()
+            self._alive = False
+            self._reap_posix()
+
+    def _on_posix_writable(self) -> None:
+        import os
+
+        try:
+            written = os.write(self._master_fd, self._pending)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._write_notifier.setEnabled(False)
+            self._pending.clear()
+            self.error.emit(str(e))
+            return
+        del self._pending[:written]
+        if not self._pending:
+            self._write_notifier.setEnabled(False)
+
+    def _reap_posix(self) -> None:
+        # EIO only means every slave fd is closed; the child may not be reaped yet.
+        code = self._proc.poll() if self._proc else 0
+        if code is None:
+            QTimer.singleShot(50, self._reap_posix)
+            return
+        self.exited.emit(code)
@@ -10,14 +10,21 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel
 class SidebarWidget(QWidget):
     command_triggered = Signal(str)
 
-    def __init__(self, config_path: str = "config.json", parent: QWidget | None = None):
+    def __init__(
+        self,
+        config_path: str = "config.json",
+        parent: QWidget | None = None,
+        config: Dict | None = None,
+    ):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
         self.layout.addWidget(QLabel("Presets"))
+        # Prefer an already-parsed config; read config_path only as a fallback.
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                cfg = json.load(f)
-            buttons = cfg.get("sidebar_buttons", [])
+            if config is None:
+                with open(config_path, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+            buttons = config.get("sidebar_buttons", [])
         except Exception:
             buttons = []
         for item in buttons:
@@ -1,77 +1,102 @@
 from __future__ import annotations
 
-from typing import Optional
+import re
+from typing import Callable, Optional
 
-from PySide6.QtCore import Qt, QTimer, Signal
-from PySide6.QtGui import QPainter, QColor, QFont, QKeyEvent, QFontMetrics, QGuiApplication
+from PySide6.QtCore import QPointF, QRectF, Qt, Signal
+from PySide6.QtGui import QPainter, QColor, QFont, QKeyEvent, QFontMetrics, QFontMetricsF, QGuiApplication, QPixmap
 from PySide6.QtWidgets import QWidget, QMenu
 
 import pyte
 
+_INK_RE = re.compile(r"[^ \x00]+")
+
 
 class TerminalWidget(QWidget):
     key_bytes = Signal(bytes)
+    text_input = Signal(str)  # pasted/sent text; encoded only if the backend needs bytes
     resized = Signal(int, int)  # cols, rows
 
     def __init__(self, cols: int = 120, rows: int = 30, parent: Optional[QWidget] = None):
         super().__init__(parent)
         self.setFocusPolicy(Qt.StrongFocus)
         self.font = QFont("Consolas", 11)
-        self.char_width = 8
+        # Rows are drawn as whole runs of text, which relies on fixed-pitch glyphs.
+        self.font.setStyleHint(QFont.Monospace)
+        self.font.setFixedPitch(True)
+        self.font.setKerning(False)
+        self.char_width = 8.0
         self.char_height = 16
+        self.char_ascent = 12
         self.cols = cols
         self.rows = rows
 
         self.screen = pyte.Screen(self.cols, self.rows)
-        self.stream = pyte.Stream(self.screen)
+        # ByteStream decodes incrementally, so raw PTY chunks can be fed directly.
+        self.stream = pyte.ByteStream(self.screen)
+
+        # pyte records changed lines in screen.dirty; they are moved into these
+        # sets so painting and copying only revisit rows that changed.
+        self._dirty_rows: set[int] = set()
+        self._text_dirty: set[int] = set()
+        self._rstripped_lines: list[str] = []
+        self._backing: Optional[QPixmap] = None
+        self._update_metrics()
 
-        self._pending_repaint = False
-        self._coalesce_timer = QTimer(self)
-        self._coalesce_timer.setInterval(16)
-        self._coalesce_timer.timeout.connect(self._flush_repaint)
+        self._write_cb: Optional[Callable[[bytes], None]] = None
 
     # --- public API ---
+    def set_write_callback(self, cb: Optional[Callable[[bytes], None]]) -> None:
+        """Send keystrokes straight to cb instead of emitting key_bytes."""
+        self._write_cb = cb
+
     def feed_output(self, data: bytes) -> None:
-        text = data.decode("utf-8", errors="replace")
-        self.stream.feed(text)
-        if not self._pending_repaint:
-            self._pending_repaint = True
-            self._coalesce_timer.start()
+        self.stream.feed(data)
+        # Qt merges pending update() requests into a single paintEvent.
+        self.update()
 
     # --- paint ---
     def paintEvent(self, event):  # type: ignore[override]
-        painter = QPainter(self)
-        painter.fillRect(self.rect(), QColor(0, 0, 0))
-        painter.setFont(self.font)
-        fm = painter.fontMetrics()
-        self.char_width = fm.horizontalAdvance("M")
-        self.char_height = fm.height()
+        self._update_backing()
 
-        for y, line in enumerate(self.screen.display):
-            if y >= self.rows:
-                break
-            for x, ch in enumerate(line):
-                if ch == "\x00" or ch == " ":
-                    continue
-                painter.setPen(QColor(200, 200, 200))
-                painter.drawText(x * self.char_width, (y + 1) * self.char_height, ch)
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._backing)
 
         cx, cy = self.screen.cursor.x, self.screen.cursor.y
         painter.fillRect(
-            cx * self.char_width,
-            cy * self.char_height + self.char_height - 2,
-            self.char_width,
-            2,
+            QRectF(cx * self.char_width, cy * self.char_height + self.char_height - 2, self.char_width, 2),
             QColor(200, 200, 200),
         )
 
+    def _update_backing(self) -> None:
+        """Repaint dirty rows onto the cached backing pixmap."""
+        self._collect_dirty()
+        dpr = self.devicePixelRatioF()
+        if self._backing is None or self._backing.size() != self.size() * dpr:
+            self._backing = QPixmap(self.size() * dpr)
+            self._backing.setDevicePixelRatio(dpr)
+            self._backing.fill(QColor(0, 0, 0))
+            self._dirty_rows.update(range(self.rows))
+        if not self._dirty_rows:
+            return
+
+        painter = QPainter(self._backing)
+        painter.setFont(self.font)
+        painter.setPen(QColor(200, 200, 200))
+        w, h, ascent = self.char_width, self.char_height, self.char_ascent
+        for y in self._dirty_rows:
+            if y >= self.rows:
+                continue
+            painter.fillRect(0, y * h, self.width(), h, QColor(0, 0, 0))
+            for x, text in self._ink_runs(y):
+                painter.drawText(QPointF(x * w, y * h + ascent), text)
+        painter.end()
+        self._dirty_rows.clear()
+
     def resizeEvent(self, event) -> None:  # type: ignore[override]
         super().resizeEvent(event)
-        fm = QFontMetrics(self.font)
-        cw = max(1, fm.horizontalAdvance("M"))
-        ch = max(1, fm.height())
-        cols = max(10, self.width() // cw)
-        rows = max(5, self.height() // ch)
+        cols = max(10, int(self.width() // self.char_width))
+        rows = max(5, self.height() // self.char_height)
         if cols != self.cols or rows != self.rows:
             self.cols = cols
             self.rows = rows
@@ -95,7 +120,10 @@ class TerminalWidget(QWidget):
                 return
         b = self._map_key(event)
         if b is not None:
-            self.key_bytes.emit(b)
+            if self._write_cb is not None:
+                self._write_cb(b)
+            else:
+                self.key_bytes.emit(b)
         else:
             super().keyPressEvent(event)
 
@@ -104,7 +132,7 @@ class TerminalWidget(QWidget):
             payload = text
             if enter and not payload.endswith("\n") and not payload.endswith("\r"):
                 payload += "\r\n"
-            self.key_bytes.emit(payload.encode("utf-8", errors="replace"))
+            self.text_input.emit(payload)
         except Exception:
             pass
 
@@ -164,7 +192,7 @@ class TerminalWidget(QWidget):
     # --- clipboard/context menu ---
     def _copy_to_clipboard(self) -> None:
         try:
-            text = "\n".join(line.rstrip() for line in self.screen.display[: self.rows])
+            text = "\n".join(self._screen_lines())
             QGuiApplication.clipboard().setText(text)
         except Exception:
             pass
@@ -175,7 +203,7 @@ class TerminalWidget(QWidget):
             if not text:
                 return
             normalized = text.replace("\r\n", "\n").replace("\r", "\n").replace("\n", "\r\n")
-            self.key_bytes.emit(normalized.encode())
+            self.text_input.emit(normalized)
         except Exception:
             pass
 
@@ -190,7 +218,47 @@ class TerminalWidget(QWidget):
             self._paste_from_clipboard()
 
     # --- internals ---
-    def _flush_repaint(self) -> None:
-        self._coalesce_timer.stop()
-        self._pending_repaint = False
-        self.update()
+    def _update_metrics(self) -> None:
+        """Cache cell metrics for self.font; call again after changing the font."""
+        fm = QFontMetrics(self.font)
+        # Fractional advance: glyphs in a run are placed at multiples of the
+        # real advance, so rounding it would shift run starts against them.
+        self.char_width = max(1.0, QFontMetricsF(self.font).horizontalAdvance("M"))
+        self.char_height = max(1, fm.height())
+        self.char_ascent = fm.ascent()
+        self._backing = None
+
+    def _collect_dirty(self) -> None:
+        dirty = self.screen.dirty
+        if dirty:
+            self._dirty_rows |= dirty
+            self._text_dirty |= dirty
+            dirty.clear()
+
+    def _row_cells(self, y: int) -> list[str]:
+        # Wide characters leave an empty string in the cell that follows them.
+        line = self.screen.buffer[y]
+        return [line[x].data for x in range(self.cols)]
+
+    def _ink_runs(self, y: int):
+        """Yield (column, text) for each run of non-blank cells in row y."""
+        cells = self._row_cells(y)
+        row = "".join(cells)
+        if len(row) == len(cells) and "" not in cells:
+            # One code point per cell, so string offsets are columns and each
+            # run can be drawn with a single drawText call.
+            return ((m.start(), m.group()) for m in _INK_RE.finditer(row))
+        # Wide or combining characters: fall back to one cell at a time.
+        return ((x, ch) for x, ch in enumerate(cells) if ch and ch != "\x00" and ch != " ")
+
+    def _screen_lines(self) -> list[str]:
+        """Right-stripped screen lines, re-rendering only rows that changed."""
+        self._collect_dirty()
+        if len(self._rstripped_lines) != self.rows:
+            self._rstripped_lines = [""] * self.rows
+            self._text_dirty.update(range(self.rows))
+        for y in self._text_dirty:
+            if y < self.rows:
+                self._rstripped_lines[y] = "".join(self._row_cells(y)).rstrip()
+        self._text_dirty.clear()
+        return self._rstripped_lines